@@ -2,24 +2,39 @@ from intent_detector import IntentDetector, detect_intent
 from concept_resolver import ConceptResolver, resolve_concept, ConceptNotFoundError
 from level_estimator import LevelEstimator, estimate_level
 from cri_emitter import CRIEmitter, emit_cri
-from scene_sequencer import SceneSequencer, plan_scenes
+from scene_sequencer import SceneSequencer, plan_scenes, plan_scenes_many
 from gemini_prompt_builder import GeminiPromptBuilder, generate_prompts
+from statistical_classifier import StatisticalModel, StatisticalIntentDetector, StatisticalLevelEstimator
+from sharded_concept_resolver import ShardedConceptResolver, partition_ontology
+from response_serializer import ResponseSerializer, serialize_result
+from shared_cache import SharedResultCache
+from traffic_recorder import TrafficRecorder
 from main import IntentResolutionPipeline, resolve_query
 
 __all__ = [
     'IntentDetector',
     'ConceptResolver',
+    'ShardedConceptResolver',
     'LevelEstimator',
     'CRIEmitter',
     'SceneSequencer',
     'GeminiPromptBuilder',
     'IntentResolutionPipeline',
+    'StatisticalModel',
+    'StatisticalIntentDetector',
+    'StatisticalLevelEstimator',
+    'TrafficRecorder',
+    'ResponseSerializer',
+    'SharedResultCache',
     'detect_intent',
     'resolve_concept',
     'estimate_level',
     'emit_cri',
     'plan_scenes',
+    'plan_scenes_many',
     'generate_prompts',
     'resolve_query',
+    'partition_ontology',
+    'serialize_result',
     'ConceptNotFoundError',
 ]
@@ -0,0 +1,88 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from main import IntentResolutionPipeline
+from gemini_prompt_builder import GeminiPromptBuilder
+
+
+QUERIES = [
+    "Explain KCL",
+    "What is Ohm's law?",
+    "Review Kirchhoff's voltage law",
+    "Test my understanding of series circuits",
+    "Teach me about capacitors"
+]
+
+
+class SlowPromptBuilder(GeminiPromptBuilder):
+    def __init__(self, cost_ms: float = 2.0):
+        super().__init__()
+        self.cost_ms = cost_ms
+
+    def build_prompts(self, concept_name, scene_program, misconceptions=None):
+        time.sleep(self.cost_ms / 1000)
+        return super().build_prompts(concept_name, scene_program, misconceptions)
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_load(budget_ms=None, rate_rps=2200, duration_s=1.0, workers=4, seed=7):
+    rng = random.Random(seed)
+    pipeline = IntentResolutionPipeline()
+    pipeline.prompt_builder = SlowPromptBuilder()
+
+    def one(i, arrival):
+        deadline = None if budget_ms is None else arrival + budget_ms / 1000
+        result = pipeline.resolve(QUERIES[i % len(QUERIES)], verbose=True, deadline=deadline)
+        return (time.monotonic() - arrival) * 1000, "degraded" in result
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.monotonic()
+        next_arrival = start
+        i = 0
+        while next_arrival - start < duration_s:
+            delay = next_arrival - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(one, i, next_arrival))
+            next_arrival += rng.expovariate(rate_rps)
+            i += 1
+
+        samples = [future.result() for future in futures]
+
+    latencies = sorted(latency for latency, _ in samples)
+    degraded = sum(1 for _, was_degraded in samples if was_degraded)
+
+    return {
+        "requests": len(samples),
+        "p50": _percentile(latencies, 50),
+        "p99": _percentile(latencies, 99),
+        "max": latencies[-1],
+        "degraded": degraded / len(samples)
+    }
+
+
+def main():
+    print("=" * 80)
+    print("Latency Budget Benchmark (open-loop synthetic load, 2ms prompt stage, 4 workers)")
+    print("=" * 80)
+    print()
+    print(f"{'budget':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10} {'degraded':>10}")
+    print("-" * 80)
+
+    for budget_ms in (None, 50.0, 20.0, 10.0):
+        stats = run_load(budget_ms)
+        label = "none" if budget_ms is None else f"{budget_ms:g}ms"
+        print(f"{label:>10} {stats['p50']:>10.2f} {stats['p99']:>10.2f} "
+              f"{stats['max']:>10.2f} {stats['degraded']:>10.1%}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import json
+import timeit
+
+from main import IntentResolutionPipeline
+from response_serializer import ResponseSerializer
+
+
+QUERIES = [
+    "Explain KCL",
+    "What is Ohm's law?",
+    "Review Kirchhoff's voltage law",
+    "Test my understanding of series circuits",
+    "Teach me about capacitors",
+    "Derive the proof of KVL",
+    "Explain phasor analysis of power"
+]
+
+USER_STATES = [
+    None,
+    {"recent_quiz_result": "incorrect"},
+    {"concept_mastery": {"KCL-001": "weak"}}
+]
+
+
+def _compare(label, results, rounds):
+    serializer = ResponseSerializer()
+    for result in results:
+        assert serializer.dumpb(result) == json.dumps(result).encode('ascii')
+
+    baseline = timeit.timeit(lambda: [json.dumps(r).encode('ascii') for r in results], number=rounds)
+    spliced = timeit.timeit(lambda: [serializer.dumpb(r) for r in results], number=rounds)
+    per_result = rounds * len(results) / 1e6
+
+    print(label)
+    print(f"  json.dumps:          {baseline / per_result:8.2f} µs/result")
+    print(f"  ResponseSerializer:  {spliced / per_result:8.2f} µs/result")
+    print(f"  Speedup:             {baseline / spliced:8.2f}x")
+    print()
+
+
+def main(rounds=2000):
+    print("=" * 80)
+    print("Response Serializer Benchmark")
+    print("=" * 80)
+    print()
+
+    pipeline = IntentResolutionPipeline()
+
+    _compare("Single hot concept:", [pipeline.resolve(QUERIES[0])], rounds * len(QUERIES))
+    _compare(
+        "Mixed concepts, levels and personalization:",
+        [
+            pipeline.resolve(query, user_state=user_state)
+            for query in QUERIES
+            for user_state in USER_STATES
+        ],
+        rounds // len(USER_STATES)
+    )
+    _compare(
+        "Mixed concepts with verbose metadata:",
+        [pipeline.resolve(query, verbose=True) for query in QUERIES],
+        rounds
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import time
+from multiprocessing import Pool
+
+from concept_resolver import ConceptResolver
+from main import IntentResolutionPipeline
+from shared_cache import SharedResultCache
+
+
+QUERIES = [
+    "Explain KCL",
+    "What is Ohm's law?",
+    "Review Kirchhoff's voltage law",
+    "Test my understanding of series circuits",
+    "Teach me about capacitors"
+]
+
+
+def _time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(QUERIES[i % len(QUERIES)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _write_synthetic_ontology(path, n_concepts):
+    with open(os.path.join(os.path.dirname(__file__), "ontology", "concepts.json"), encoding='utf-8') as f:
+        concepts = json.load(f)["concepts"]
+
+    for i in range(n_concepts):
+        concepts.append({
+            "id": f"SYN-{i:06d}",
+            "name": f"Synthetic concept {i}",
+            "aliases": [f"synthetic alias {i}", f"syn-{i}"],
+            "domain": "Synthetic",
+            "prerequisites": [],
+            "common_misconceptions": [f"misconception {i}"]
+        })
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"concepts": concepts}, f)
+
+
+def _report(label, uncached, cached, iterations):
+    for query in QUERIES:
+        cached.resolve(query)
+
+    recompute_us = _time_per_call(uncached.resolve, iterations)
+    hit_us = _time_per_call(cached.resolve, iterations)
+
+    print(label)
+    print(f"  Recompute:          {recompute_us:10.1f} µs/request")
+    print(f"  Shared cache hit:   {hit_us:10.1f} µs/request")
+    print(f"  Speedup:            {recompute_us / hit_us:10.2f}x")
+    print()
+
+
+def _worker(args):
+    cache_path, iterations = args
+    pipeline = IntentResolutionPipeline.with_shared_cache(cache_path)
+    return _time_per_call(pipeline.resolve, iterations)
+
+
+def main(iterations=20000, processes=4, large_ontology=20000):
+    print("=" * 80)
+    print("Shared Resolution Cache Benchmark")
+    print("=" * 80)
+    print()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "resolution_cache.sqlite")
+
+        _report(
+            "Bundled ontology:",
+            IntentResolutionPipeline(),
+            IntentResolutionPipeline(cache=SharedResultCache(cache_path)),
+            iterations
+        )
+
+        ontology_path = os.path.join(tmp, "synthetic_concepts.json")
+        _write_synthetic_ontology(ontology_path, large_ontology)
+        _report(
+            f"Synthetic ontology ({large_ontology} extra concepts):",
+            IntentResolutionPipeline(concept_resolver=ConceptResolver(ontology_path)),
+            IntentResolutionPipeline(
+                concept_resolver=ConceptResolver(ontology_path),
+                cache=SharedResultCache(os.path.join(tmp, "synthetic_cache.sqlite"))
+            ),
+            iterations // 100
+        )
+
+        with Pool(processes) as pool:
+            per_process = pool.map(_worker, [(cache_path, iterations // processes)] * processes)
+
+        print(f"Cache hit with {processes} concurrent processes:")
+        for i, hit in enumerate(per_process, 1):
+            print(f"  worker {i}: {hit:8.1f} µs/request")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+LIST_FIELDS = ("aliases", "prerequisites", "common_misconceptions")
+CONCEPT_FIELDS = ("id", "name", "aliases", "domain", "prerequisites", "common_misconceptions")
+KNOWN_FIELDS = frozenset(CONCEPT_FIELDS)
+
+
+class CompactConceptStore:
+    def __init__(self, concepts: List[Dict]):
+        ids = []
+        names = []
+        domains = []
+        columns = {field: [] for field in LIST_FIELDS}
+        offsets = {field: array('I', [0]) for field in LIST_FIELDS}
+        extras = {}
+        shapes = []
+        interned = {}
+        interned_shapes = {}
+
+        def _intern(value):
+            return interned.setdefault(value, value) if type(value) is str else value
+
+        for index, concept in enumerate(concepts):
+            ids.append(_intern(concept['id']))
+            names.append(_intern(concept['name']))
+            domains.append(_intern(concept.get('domain')))
+
+            for field in LIST_FIELDS:
+                column = columns[field]
+                column.extend([_intern(value) for value in concept.get(field, ())])
+                offsets[field].append(len(column))
+
+            if not KNOWN_FIELDS.issuperset(concept):
+                extras[index] = {k: v for k, v in concept.items() if k not in KNOWN_FIELDS}
+
+            shape = tuple(concept)
+            shapes.append(interned_shapes.setdefault(shape, shape))
+
+        self.ids = tuple(ids)
+        self.names = tuple(names)
+        self.domains = tuple(domains)
+        self.columns = {field: tuple(column) for field, column in columns.items()}
+        self.offsets = offsets
+        self.extras = extras
+        self.shapes = tuple(shapes)
+        self.id_to_index = {}
+
+    def build_id_index(self):
+        self.id_to_index = {concept_id: index for index, concept_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def list_field(self, field: str, index: int) -> Tuple[str, ...]:
+        offsets = self.offsets[field]
+        return self.columns[field][offsets[index]:offsets[index + 1]]
+
+    def iter_aliases(self) -> Iterator[Tuple[str, int]]:
+        aliases = self.columns['aliases']
+        offsets = self.offsets['aliases']
+
+        for index, name in enumerate(self.names):
+            yield name, index
+            for position in range(offsets[index], offsets[index + 1]):
+                yield aliases[position], index
+
+
+class AliasIndex(Mapping):
+    __slots__ = ('_store', '_keys', '_indices', '_order')
+
+    def __init__(self, store: CompactConceptStore, normalize: Callable[[str], str]):
+        slots = {}
+        keys = []
+        indices = array('I')
+
+        for alias, index in store.iter_aliases():
+            key = normalize(alias)
+            if key == alias:
+                key = alias
+
+            slot = slots.get(key)
+            if slot is None:
+                slots[key] = len(keys)
+                keys.append(key)
+                indices.append(index)
+            else:
+                indices[slot] = index
+
+        del slots
+        self._store = store
+        self._keys = tuple(keys)
+        self._indices = indices
+        self._order = array('I', sorted(range(len(keys)), key=keys.__getitem__))
+
+    def _slot(self, key: str) -> int:
+        position = bisect_left(self._order, key, key=self._keys.__getitem__)
+        if position < len(self._order):
+            slot = self._order[position]
+            if self._keys[slot] == key:
+                return slot
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> str:
+        return self._store.ids[self._indices[self._slot(key)]]
+
+    def __contains__(self, key) -> bool:
+        try:
+            self._slot(key)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class ConceptView(Mapping):
+    """Read-only view of one concept; list fields are returned as immutable tuples."""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: CompactConceptStore, index: int):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key: str):
+        store = self._store
+        if key not in store.shapes[self._index]:
+            raise KeyError(key)
+        if key == 'id':
+            return store.ids[self._index]
+        if key == 'name':
+            return store.names[self._index]
+        if key == 'domain':
+            return store.domains[self._index]
+        if key in store.offsets:
+            return store.list_field(key, self._index)
+
+        return store.extras[self._index][key]
+
+    def __iter__(self):
+        return iter(self._store.shapes[self._index])
+
+    def __len__(self) -> int:
+        return len(self._store.shapes[self._index])
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == {
+            key: list(value) if isinstance(other, ConceptView) and key in LIST_FIELDS else value
+            for key, value in other.items()
+        }
+
+    __hash__ = None
+
+    def to_dict(self) -> Dict:
+        concept = {}
+        for key in self:
+            value = self[key]
+            concept[key] = list(value) if key in LIST_FIELDS else value
+        return concept
+
+    def __repr__(self) -> str:
+        return f"ConceptView({self.to_dict()!r})"
+
+
+class ConceptTable(Sequence):
+    """Returned by ConceptResolver.get_all_concepts() in compact mode instead of a list of dicts.
+
+    Items are ConceptView mappings; they compare equal to the source dicts, but
+    json.dumps() needs view.to_dict().
+    """
+
+    __slots__ = ('_store',)
+
+    def __init__(self, store: CompactConceptStore):
+        self._store = store
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ConceptView(self._store, i) for i in range(*index.indices(len(self._store)))]
+        if index < 0:
+            index += len(self._store)
+        if not 0 <= index < len(self._store):
+            raise IndexError("concept index out of range")
+        return ConceptView(self._store, index)
+
+    def __len__(self) -> int:
+        return len(self._store)
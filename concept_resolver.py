@@ -1,30 +1,88 @@
+import hashlib
 import json
 import os
 import re
-from typing import Dict, List, Optional
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
 from pathlib import Path
 
+from compact_ontology import AliasIndex, CompactConceptStore, ConceptTable
+
 
 class ConceptNotFoundError(Exception):
     pass
 
 
+def normalize_text(text: str) -> str:
+    return re.sub(r'\s+', ' ', text.lower().strip())
+
+
+@contextmanager
+def _traced(report: Optional[Dict[str, int]], key: str):
+    if report is None:
+        yield
+        return
+    
+    start = tracemalloc.get_traced_memory()[0]
+    yield
+    report[key] = tracemalloc.get_traced_memory()[0] - start
+
+
 class ConceptResolver:
-    def __init__(self, ontology_path: Optional[str] = None):
+    def __init__(self, ontology_path: Optional[str] = None, compact: bool = False, track_memory: bool = False):
         if ontology_path is None:
             current_dir = Path(__file__).parent
             ontology_path = current_dir / "ontology" / "concepts.json"
         
         self.ontology_path = ontology_path
-        self.concepts = self._load_ontology()
-        self._build_lookup_index()
+        self.compact = compact
+        self._memory_report = None
+        
+        if not track_memory:
+            self._build()
+            return
+        
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        try:
+            self._memory_report = {}
+            self._build(self._memory_report)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+    
+    def _build(self, report: Optional[Dict[str, int]] = None):
+        with _traced(report, "concepts"):
+            self._build_storage(self._load_ontology())
+        
+        if self.compact:
+            with _traced(report, "id_to_index"):
+                self._store.build_id_index()
+        
+        with _traced(report, "alias_to_id"):
+            self._build_lookup_index()
     
     def _load_ontology(self) -> List[Dict]:
-        with open(self.ontology_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(self.ontology_path, 'rb') as f:
+            raw = f.read()
+        self.ontology_version = hashlib.sha1(raw).hexdigest()[:16]
+        data = json.loads(raw.decode('utf-8'))
         return data.get('concepts', [])
     
+    def _build_storage(self, concepts: List[Dict]):
+        if self.compact:
+            self._store = CompactConceptStore(concepts)
+            self.concepts = ConceptTable(self._store)
+        else:
+            self.concepts = concepts
+    
     def _build_lookup_index(self):
+        if self.compact:
+            self.alias_to_id = AliasIndex(self._store, self._normalize_text)
+            return
+        
         self.alias_to_id = {}
         
         for concept in self.concepts:
@@ -38,13 +96,13 @@ class ConceptResolver:
                 self.alias_to_id[normalized_alias] = concept_id
     
     def _normalize_text(self, text: str) -> str:
-        return re.sub(r'\s+', ' ', text.lower().strip())
+        return normalize_text(text)
     
     def extract_candidates(self, query: str) -> List[str]:
         query_normalized = self._normalize_text(query)
         candidates = []
         
-        for alias in self.alias_to_id.keys():
+        for alias in self.alias_to_id:
             if alias in query_normalized:
                 candidates.append(alias)
         
@@ -63,25 +121,44 @@ class ConceptResolver:
         matched_alias = candidates[0]
         concept_id = self.alias_to_id[matched_alias]
         
-        concept = self._get_concept_by_id(concept_id)
-        
         return {
             "concept_id": concept_id,
-            "concept": concept,
+            "concept": self.get_concept(concept_id),
             "matched_alias": matched_alias
         }
     
+    def get_concept(self, concept_id: str) -> Dict:
+        concept = self._get_concept_by_id(concept_id)
+        if self.compact:
+            return concept.to_dict()
+        return concept
+    
     def _get_concept_by_id(self, concept_id: str) -> Dict:
+        if self.compact:
+            index = self._store.id_to_index.get(concept_id)
+            if index is not None:
+                return self.concepts[index]
+            raise ValueError(f"Concept ID {concept_id} not found in ontology")
+        
         for concept in self.concepts:
             if concept['id'] == concept_id:
                 return concept
         
         raise ValueError(f"Concept ID {concept_id} not found in ontology")
     
-    def get_all_concepts(self) -> List[Dict]:
+    def get_all_concepts(self) -> Sequence[Dict]:
+        if self.compact:
+            return self.concepts
         return self.concepts.copy()
+    
+    def memory_report(self) -> Dict[str, int]:
+        if self._memory_report is None:
+            raise RuntimeError("memory_report() requires ConceptResolver(..., track_memory=True)")
+        
+        report = dict(self._memory_report)
+        report["total"] = sum(report.values())
+        return report
 
-
-def resolve_concept(query: str, ontology_path: Optional[str] = None) -> Dict[str, any]:
-    resolver = ConceptResolver(ontology_path)
+def resolve_concept(query: str, ontology_path: Optional[str] = None, compact: bool = False) -> Dict[str, any]:
+    resolver = ConceptResolver(ontology_path, compact)
     return resolver.resolve(query)
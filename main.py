@@ -1,5 +1,8 @@
 import json
-from typing import Dict
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
 
 from intent_detector import IntentDetector
 from concept_resolver import ConceptResolver, ConceptNotFoundError
@@ -7,64 +10,380 @@ from level_estimator import LevelEstimator
 from cri_emitter import CRIEmitter
 from scene_sequencer import SceneSequencer
 from gemini_prompt_builder import GeminiPromptBuilder
+from traffic_recorder import TrafficRecorder, timed_stage
+from response_serializer import ResponseSerializer
+from shared_cache import SharedResultCache
+
+
+STAGE_DEPENDENCIES = {
+    "intent_detection": (),
+    "concept_resolution": (),
+    "level_estimation": (),
+    "cri_emission": ("intent_detection", "concept_resolution", "level_estimation"),
+    "scene_planning": ("cri_emission",),
+    "prompt_building": ("scene_planning",),
+}
+
+OUTPUT_STAGES = {
+    "cri": ("cri_emission",),
+    "scene_plan": ("scene_planning",),
+    "prompts": ("prompt_building",),
+    "metadata": ("intent_detection", "concept_resolution", "level_estimation"),
+}
+
+DEFAULT_OUTPUTS = ("cri", "scene_plan", "prompts")
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def required_stages(outputs: frozenset) -> frozenset:
+    stages = set()
+    pending = [stage for output in outputs for stage in OUTPUT_STAGES[output]]
+    
+    while pending:
+        stage = pending.pop()
+        if stage not in stages:
+            stages.add(stage)
+            pending.extend(STAGE_DEPENDENCIES[stage])
+    
+    return frozenset(stages)
 
 
 class IntentResolutionPipeline:
-    def __init__(self):
-        self.intent_detector = IntentDetector()
-        self.concept_resolver = ConceptResolver()
-        self.level_estimator = LevelEstimator()
+    STAGE_COST_SMOOTHING = 0.2
+    MAX_DEADLINE_HORIZON_S = 86400.0
+    
+    def __init__(self, intent_detector=None, level_estimator=None, recorder: Optional[TrafficRecorder] = None,
+                 concept_resolver=None, cache: Optional[SharedResultCache] = None):
+        self.intent_detector = intent_detector or IntentDetector()
+        self.concept_resolver = concept_resolver or ConceptResolver()
+        self.level_estimator = level_estimator or LevelEstimator()
         self.cri_emitter = CRIEmitter()
         self.scene_sequencer = SceneSequencer()
         self.prompt_builder = GeminiPromptBuilder()
+        self.recorder = recorder
+        self.serializer = ResponseSerializer()
+        self._stage_cost_estimates = {}
+        self.cache = cache
+        self.cache_version = ":".join([
+            getattr(self.concept_resolver, 'ontology_version', 'unversioned'),
+            type(self.intent_detector).__name__,
+            getattr(self.intent_detector, 'model_version', ''),
+            type(self.level_estimator).__name__,
+            getattr(self.level_estimator, 'model_version', '')
+        ])
     
-    def resolve(self, query: str, verbose: bool = False, quiz_result: str = None, user_state: Dict = None) -> Dict:
-        intent_result = self.intent_detector.detect(query)
-        intent = intent_result['intent']
-        
-        concept_result = self.concept_resolver.resolve(query)
-        concept = concept_result['concept']
-        concept_id = concept_result['concept_id']
-        
-        level_result = self.level_estimator.estimate(query)
-        level = level_result['level']
-        
-        cri = self.cri_emitter.emit(
-            intent=intent,
-            concept_id=concept_id,
-            concept_name=concept['name'],
-            domain=concept['domain'],
-            level=level,
-            misconceptions=concept.get('common_misconceptions', []),
-            prerequisites=concept.get('prerequisites', [])
-        )
+    @classmethod
+    def with_statistical_engine(cls, model_path: str) -> "IntentResolutionPipeline":
+        from statistical_classifier import load_statistical_engine
+        intent_detector, level_estimator = load_statistical_engine(model_path)
+        return cls(intent_detector=intent_detector, level_estimator=level_estimator)
+    
+    @classmethod
+    def with_shared_cache(cls, cache_path: str, **kwargs) -> "IntentResolutionPipeline":
+        return cls(cache=SharedResultCache(cache_path, **kwargs))
+    
+    @classmethod
+    def with_sharded_ontology(cls, ontology_dir: str, **kwargs) -> "IntentResolutionPipeline":
+        from sharded_concept_resolver import ShardedConceptResolver
+        return cls(concept_resolver=ShardedConceptResolver.from_directory(ontology_dir, **kwargs))
+    
+    def resolve(self, query: str, verbose: bool = False, quiz_result: str = None, user_state: Dict = None,
+                shards: Optional[List[str]] = None, budget_ms: Optional[float] = None,
+                deadline: Optional[float] = None, fields: Optional[Iterable[str]] = None) -> Dict:
+        if fields is not None:
+            fields = self._validate_fields(fields)
+        outputs = self._requested_outputs(fields, verbose)
+        
+        self._check_shards(shards)
+        self._check_deadline(deadline)
+        
+        if budget_ms is not None:
+            budget_deadline = time.monotonic() + budget_ms / 1000
+            deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+        
+        effective_budget_ms = None if deadline is None else max(0.0, (deadline - time.monotonic()) * 1000)
         
-        scene_plan = self.scene_sequencer.plan_sequence(cri, quiz_result, user_state)
+        if self.recorder is None:
+            return self._resolve_cached(query, outputs, quiz_result, user_state, shards, deadline)
         
-        prompts = self.prompt_builder.build_prompts(
-            concept_name=cri['concept_name'],
-            scene_program=scene_plan['scene_program'],
-            misconceptions=cri.get('risk_misconceptions', [])
+        timings = {}
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            result = self._resolve_cached(query, outputs, quiz_result, user_state, shards, deadline, timings)
+        except Exception as e:
+            self._record(
+                query, verbose, quiz_result, user_state, timings,
+                (time.perf_counter() - start) * 1000, error=e, shards=shards, fields=fields,
+                ts=started_at, budget_ms=effective_budget_ms
+            )
+            raise
+        
+        self._record(
+            query, verbose, quiz_result, user_state, timings,
+            (time.perf_counter() - start) * 1000, result=result, shards=shards, fields=fields,
+            ts=started_at, budget_ms=effective_budget_ms
         )
+        return result
+    
+    def _record(self, *args, **kwargs):
+        try:
+            self.recorder.record(*args, **kwargs)
+        except Exception:
+            logger.exception("Failed to record traffic for query %r", args[0] if args else None)
+    
+    def resolve_json(self, query: str, verbose: bool = False, quiz_result: str = None, user_state: Dict = None,
+                     shards: Optional[List[str]] = None, budget_ms: Optional[float] = None,
+                     deadline: Optional[float] = None, fields: Optional[Iterable[str]] = None) -> bytes:
+        return self.serializer.dumpb(
+            self.resolve(query, verbose, quiz_result, user_state, shards, budget_ms, deadline, fields)
+        )
+    
+    def _check_shards(self, shards: Optional[List[str]]):
+        if shards is not None and not hasattr(self.concept_resolver, "route"):
+            raise ValueError(
+                "shards requires a sharded concept resolver; "
+                "use IntentResolutionPipeline.with_sharded_ontology()"
+            )
+    
+    def _check_deadline(self, deadline: Optional[float]):
+        if deadline is not None and deadline > time.monotonic() + self.MAX_DEADLINE_HORIZON_S:
+            raise ValueError(
+                f"deadline must be a time.monotonic() timestamp, got {deadline!r} which is more than "
+                f"{self.MAX_DEADLINE_HORIZON_S:g}s away (a time.time() value?); use budget_ms for relative budgets"
+            )
+    
+    def _validate_fields(self, fields: Iterable[str]) -> frozenset:
+        if isinstance(fields, str):
+            raise TypeError(
+                f"fields must be a collection of output names, not a string; use fields={{{fields!r}}}"
+            )
         
-        result = {
-            "cri": cri,
-            "scene_plan": scene_plan,
-            "prompts": prompts
-        }
+        fields = frozenset(fields)
+        unknown = fields - set(OUTPUT_STAGES)
+        if unknown:
+            raise ValueError(
+                f"Unknown output field(s): {sorted(unknown)}. Expected any of {list(OUTPUT_STAGES)}"
+            )
+        
+        return fields
+    
+    def _requested_outputs(self, fields: Optional[frozenset], verbose: bool) -> frozenset:
+        outputs = set(DEFAULT_OUTPUTS if fields is None else fields)
         
         if verbose:
-            result["metadata"] = {
-                "query": query,
-                "intent_detection": intent_result,
-                "concept_resolution": {
-                    "concept_id": concept_id,
-                    "matched_alias": concept_result['matched_alias']
-                },
-                "level_estimation": level_result
-            }
+            outputs.add("metadata")
+        
+        return frozenset(outputs)
+    
+    def _resolve_cached(self, query: str, outputs: frozenset, quiz_result: Optional[str], user_state: Optional[Dict],
+                        shards: Optional[List[str]] = None, deadline: Optional[float] = None,
+                        timings: Optional[Dict[str, float]] = None) -> Dict:
+        if self.cache is None or quiz_result is not None:
+            return self._resolve(query, outputs, quiz_result, user_state, shards, deadline, timings)
+        
+        cache_query = query if "metadata" in outputs else query.lower().strip()
+        try:
+            key = self.cache.make_key(self.cache_version, cache_query, outputs, user_state, shards)
+        except (TypeError, ValueError):
+            return self._resolve(query, outputs, quiz_result, user_state, shards, deadline, timings)
+        
+        with timed_stage(timings, "cache_lookup"):
+            cached = self.cache.get(key)
+        
+        if cached is not None:
+            result = json.loads(cached)
+            scene_plan = result.get("scene_plan")
+            if scene_plan is not None:
+                self.scene_sequencer.session_state[scene_plan["concept_id"]] = {
+                    "last_sequence": scene_plan["scene_program"],
+                    "quiz_result": None
+                }
+            return result
+        
+        result = self._resolve(query, outputs, quiz_result, user_state, shards, deadline, timings)
+        if "degraded" not in result:
+            self.cache.put(key, self.serializer.dumpb(result))
+        return result
+    
+    def _within_budget(self, stage: str, deadline: Optional[float]) -> bool:
+        if deadline is None:
+            return True
+        
+        estimate = self._stage_cost_estimates.get(stage, 0.0)
+        if deadline - time.monotonic() > estimate:
+            return True
+        
+        self._stage_cost_estimates[stage] = estimate * (1 - self.STAGE_COST_SMOOTHING)
+        return False
+    
+    def _observe_stage_cost(self, stage: str, seconds: float):
+        previous = self._stage_cost_estimates.get(stage)
+        if previous is None:
+            self._stage_cost_estimates[stage] = seconds
+        else:
+            self._stage_cost_estimates[stage] = previous + self.STAGE_COST_SMOOTHING * (seconds - previous)
+    
+    def _resolve(self, query: str, outputs: frozenset, quiz_result: Optional[str], user_state: Optional[Dict],
+                 shards: Optional[List[str]] = None, deadline: Optional[float] = None,
+                 timings: Optional[Dict[str, float]] = None) -> Dict:
+        stages = required_stages(outputs)
+        result = {}
+        skipped = []
+        
+        if "intent_detection" in stages:
+            with timed_stage(timings, "intent_detection"):
+                intent_result = self.intent_detector.detect(query)
+        
+        if "concept_resolution" in stages:
+            with timed_stage(timings, "concept_resolution"):
+                if shards is None:
+                    concept_result = self.concept_resolver.resolve(query)
+                else:
+                    concept_result = self.concept_resolver.resolve(query, shards=shards)
+        
+        if "level_estimation" in stages:
+            with timed_stage(timings, "level_estimation"):
+                level_result = self.level_estimator.estimate(query)
+        
+        if "cri_emission" in stages:
+            with timed_stage(timings, "cri_emission"):
+                concept = concept_result['concept']
+                cri = self.cri_emitter.emit(
+                    intent=intent_result['intent'],
+                    concept_id=concept_result['concept_id'],
+                    concept_name=concept['name'],
+                    domain=concept['domain'],
+                    level=level_result['level'],
+                    misconceptions=concept.get('common_misconceptions', []),
+                    prerequisites=concept.get('prerequisites', [])
+                )
+            if "cri" in outputs:
+                result["cri"] = cri
+        
+        if "scene_planning" in stages:
+            with timed_stage(timings, "scene_planning"):
+                scene_plan = self.scene_sequencer.plan_sequence(cri, quiz_result, user_state)
+            if "scene_plan" in outputs:
+                result["scene_plan"] = scene_plan
+        
+        if "prompt_building" in stages:
+            if self._within_budget("prompt_building", deadline):
+                with timed_stage(timings, "prompt_building"):
+                    stage_start = time.monotonic()
+                    result["prompts"] = self.prompt_builder.build_prompts(
+                        concept_name=cri['concept_name'],
+                        scene_program=scene_plan['scene_program'],
+                        misconceptions=cri.get('risk_misconceptions', [])
+                    )
+                    self._observe_stage_cost("prompt_building", time.monotonic() - stage_start)
+            else:
+                skipped.append("prompt_building")
+        
+        if "metadata" in outputs:
+            if self._within_budget("metadata", deadline):
+                stage_start = time.monotonic()
+                result["metadata"] = {
+                    "query": query,
+                    "intent_detection": intent_result,
+                    "concept_resolution": {
+                        "concept_id": concept_result['concept_id'],
+                        "matched_alias": concept_result['matched_alias']
+                    },
+                    "level_estimation": level_result
+                }
+                self._observe_stage_cost("metadata", time.monotonic() - stage_start)
+            else:
+                skipped.append("metadata")
+        
+        if skipped:
+            result["degraded"] = {"skipped": skipped}
         
         return result
+    
+    def resolve_cohort(self, query: str, user_states: List[Optional[Dict]],
+                       shards: Optional[List[str]] = None) -> List[Dict]:
+        self._check_shards(shards)
+        
+        if self.recorder is None:
+            return self._resolve_cohort(query, user_states, shards)
+        
+        timings = {}
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            results = self._resolve_cohort(query, user_states, shards, timings)
+        except Exception as e:
+            self._record(
+                query, False, None, None, timings, (time.perf_counter() - start) * 1000,
+                error=e, shards=shards, ts=started_at, user_states=user_states
+            )
+            raise
+        
+        self._record(
+            query, False, None, None, timings, (time.perf_counter() - start) * 1000,
+            result=results, shards=shards, ts=started_at, user_states=user_states
+        )
+        return results
+    
+    def _resolve_cohort(self, query: str, user_states: List[Optional[Dict]], shards: Optional[List[str]] = None,
+                        timings: Optional[Dict[str, float]] = None) -> List[Dict]:
+        with timed_stage(timings, "intent_detection"):
+            intent = self.intent_detector.detect(query)['intent']
+        
+        with timed_stage(timings, "concept_resolution"):
+            if shards is None:
+                concept_result = self.concept_resolver.resolve(query)
+            else:
+                concept_result = self.concept_resolver.resolve(query, shards=shards)
+            concept = concept_result['concept']
+        
+        with timed_stage(timings, "level_estimation"):
+            level = self.level_estimator.estimate(query)['level']
+        
+        with timed_stage(timings, "cri_emission"):
+            cri = self.cri_emitter.emit(
+                intent=intent,
+                concept_id=concept_result['concept_id'],
+                concept_name=concept['name'],
+                domain=concept['domain'],
+                level=level,
+                misconceptions=list(concept.get('common_misconceptions', [])),
+                prerequisites=list(concept.get('prerequisites', []))
+            )
+        
+        with timed_stage(timings, "scene_planning"):
+            scene_plans = self.scene_sequencer.plan_sequence_many(cri, user_states)
+        
+        shared_prompts = {}
+        results = []
+        with timed_stage(timings, "prompt_building"):
+            for scene_plan in scene_plans:
+                scene_program = scene_plan['scene_program']
+                if scene_program not in shared_prompts:
+                    shared_prompts[scene_program] = self.prompt_builder.build_prompts(
+                        concept_name=cri['concept_name'],
+                        scene_program=scene_program,
+                        misconceptions=cri.get('risk_misconceptions', [])
+                    )
+                
+                results.append({
+                    "cri": _copy_cri(cri),
+                    "scene_plan": scene_plan,
+                    "prompts": [dict(prompt) for prompt in shared_prompts[scene_program]]
+                })
+        
+        return results
+
+
+def _copy_cri(cri: Dict) -> Dict:
+    copied = dict(cri)
+    for key in ("risk_misconceptions", "prerequisites"):
+        if key in copied:
+            copied[key] = list(copied[key])
+    return copied
 
 
 def resolve_query(query: str, verbose: bool = False, quiz_result: str = None, user_state: Dict = None) -> Dict:
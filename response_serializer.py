@@ -0,0 +1,139 @@
+import json
+import threading
+from typing import Dict, Optional
+
+
+CACHED_SECTIONS = ("cri", "scene_plan", "prompts")
+
+
+def _is_scalar(value) -> bool:
+    return value is None or type(value) in (str, int, bool)
+
+
+def _is_str_sequence(value) -> bool:
+    return type(value) in (list, tuple) and all(type(item) is str for item in value)
+
+
+def _is_cacheable(value) -> bool:
+    if isinstance(value, dict):
+        return all(
+            type(key) is str and (_is_scalar(item) or _is_str_sequence(item))
+            for key, item in value.items()
+        )
+
+    if type(value) in (list, tuple):
+        return all(
+            type(item) is str
+            or (isinstance(item, dict) and all(type(k) is str and type(v) is str for k, v in item.items()))
+            for item in value
+        )
+
+    return False
+
+
+_SEQUENCE_TYPES = (list, tuple)
+
+
+def _value_key(value):
+    if type(value) is str:
+        return value
+    if type(value) in _SEQUENCE_TYPES:
+        return (type(value), tuple(value))
+    return (type(value), value)
+
+
+def _section_key(section: str, value) -> Optional[tuple]:
+    if isinstance(value, dict):
+        key = (
+            section,
+            tuple(value),
+            tuple([
+                item if type(item) is str
+                else (type(item), tuple(item)) if type(item) in _SEQUENCE_TYPES
+                else (type(item), item)
+                for item in value.values()
+            ])
+        )
+    elif type(value) in (list, tuple):
+        key = (
+            section,
+            type(value),
+            tuple([
+                tuple(item.items()) if type(item) is dict else _value_key(item)
+                for item in value
+            ])
+        )
+    else:
+        return None
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class ResponseSerializer:
+    DEFAULT_MAX_ENTRIES = 4096
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._fragments = {}
+        self._key_bytes = {}
+        self._lock = threading.Lock()
+
+    def _encode_key(self, key: str) -> bytes:
+        encoded = self._key_bytes.get(key)
+        if encoded is None:
+            encoded = json.dumps(key).encode('ascii') + b': '
+            self._key_bytes[key] = encoded
+        return encoded
+
+    def _encode_section(self, section: str, value) -> bytes:
+        if section not in CACHED_SECTIONS:
+            return json.dumps(value).encode('ascii')
+
+        key = _section_key(section, value)
+        if key is None:
+            return json.dumps(value).encode('ascii')
+
+        fragment = self._fragments.get(key)
+        if fragment is not None:
+            return fragment
+
+        fragment = json.dumps(value).encode('ascii')
+
+        if _is_cacheable(value):
+            with self._lock:
+                if len(self._fragments) >= self.max_entries:
+                    del self._fragments[next(iter(self._fragments))]
+                self._fragments[key] = fragment
+
+        return fragment
+
+    def dumpb(self, result: Dict) -> bytes:
+        if not isinstance(result, dict) or any(type(key) is not str for key in result):
+            return json.dumps(result).encode('ascii')
+
+        parts = []
+        for key, value in result.items():
+            parts.append(self._encode_key(key))
+            parts.append(self._encode_section(key, value))
+            parts.append(b', ')
+        parts[-1:] = [b'}']
+
+        return b'{' + b''.join(parts)
+
+    def dumps(self, result: Dict) -> str:
+        return self.dumpb(result).decode('ascii')
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+
+_default_serializer = ResponseSerializer()
+
+
+def serialize_result(result: Dict) -> bytes:
+    return _default_serializer.dumpb(result)
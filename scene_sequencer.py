@@ -1,6 +1,35 @@
 from typing import Dict, List, Optional
 from scene_library import get_scene_info
 
+LEVEL_SEQUENCES = {
+    "beginner": (
+        "define_concept",
+        "visualize_core",
+        "worked_example",
+        "mini_quiz"
+    ),
+    "intermediate": (
+        "define_concept",
+        "worked_example",
+        "common_mistake",
+        "mini_quiz"
+    ),
+    "advanced": (
+        "worked_example",
+        "common_mistake",
+        "mini_quiz"
+    )
+}
+
+DEFAULT_SEQUENCE = LEVEL_SEQUENCES["beginner"]
+
+REMEDIATION_SEQUENCE = (
+    "visualize_core",
+    "worked_example",
+    "common_mistake",
+    "mini_quiz"
+)
+
 
 class SceneSequencer:
     def __init__(self):
@@ -42,77 +71,85 @@ class SceneSequencer:
         
         return result
     
+    def plan_sequence_many(self, cri: Dict, user_states: List[Optional[Dict]]) -> List[Dict]:
+        concept_id = cri.get("concept_id", "unknown")
+        level = cri.get("level", "beginner")
+        load_budget = cri.get("load_budget", 3)
+        
+        shared_sequences = {}
+        plans = []
+        
+        for user_state in user_states:
+            key = self._personalization_key(concept_id, user_state)
+            
+            if key not in shared_sequences:
+                shared_sequences[key] = self._sequence_for_key(key, concept_id, level)
+            scene_program, personalization_reason = shared_sequences[key]
+            
+            plans.append({
+                "concept_id": cri.get("concept_id"),
+                "concept_name": cri.get("concept_name"),
+                "level": level,
+                "scene_program": scene_program,
+                "load_budget": load_budget,
+                "personalization_reason": personalization_reason
+            })
+        
+        if plans:
+            self.session_state[concept_id] = {
+                "last_sequence": list(plans[-1]["scene_program"]),
+                "quiz_result": None
+            }
+        
+        return plans
+    
     def _get_sequence_by_level(self, level: str) -> List[str]:
-        if level == "beginner":
-            return [
-                "define_concept",
-                "visualize_core",
-                "worked_example",
-                "mini_quiz"
-            ]
-        elif level == "intermediate":
-            return [
-                "define_concept",
-                "worked_example",
-                "common_mistake",
-                "mini_quiz"
-            ]
-        elif level == "advanced":
-            return [
-                "worked_example",
-                "common_mistake",
-                "mini_quiz"
-            ]
-        else:
-            return [
-                "define_concept",
-                "visualize_core",
-                "worked_example",
-                "mini_quiz"
-            ]
+        return list(LEVEL_SEQUENCES.get(level, DEFAULT_SEQUENCE))
     
     def _get_remediation_sequence(self) -> List[str]:
-        return [
-            "visualize_core",
-            "worked_example",
-            "common_mistake",
-            "mini_quiz"
-        ]
+        return list(REMEDIATION_SEQUENCE)
     
-    def _get_personalized_sequence(self, cri: Dict, user_state: Dict, level: str) -> tuple:
-        concept_id = cri.get("concept_id", "unknown")
-        recent_quiz_result = user_state.get("recent_quiz_result")
-        concept_mastery = user_state.get("concept_mastery", {})
+    def _personalization_key(self, concept_id: str, user_state: Optional[Dict]) -> tuple:
+        if not user_state:
+            return (False, False, False)
         
-        mastery_level = concept_mastery.get(concept_id, "unknown")
+        recent_quiz_failed = user_state.get("recent_quiz_result") == "incorrect"
+        weak_mastery = user_state.get("concept_mastery", {}).get(concept_id, "unknown") == "weak"
         
-        needs_remediation = (
-            recent_quiz_result == "incorrect" or 
-            mastery_level == "weak"
-        )
+        return (True, recent_quiz_failed, weak_mastery)
+    
+    def _sequence_for_key(self, key: tuple, concept_id: str, level: str) -> tuple:
+        has_user_state, recent_quiz_failed, weak_mastery = key
+        base_sequence = LEVEL_SEQUENCES.get(level, DEFAULT_SEQUENCE)
         
-        if needs_remediation:
-            base_sequence = self._get_sequence_by_level(level)
-            
-            if "define_concept" in base_sequence:
-                base_sequence.remove("define_concept")
-            
-            if "common_mistake" not in base_sequence:
-                quiz_index = base_sequence.index("mini_quiz") if "mini_quiz" in base_sequence else len(base_sequence)
-                base_sequence.insert(quiz_index, "common_mistake")
-            
-            reason_parts = []
-            if recent_quiz_result == "incorrect":
-                reason_parts.append("recent quiz failure")
-            if mastery_level == "weak":
-                reason_parts.append(f"weak mastery of {concept_id}")
-            
-            reason = f"Personalized sequence: skipped definition, added misconception handling due to {' and '.join(reason_parts)}"
-            
-            return base_sequence, reason
-        else:
+        if not has_user_state:
+            return base_sequence, f"Standard {level}-level sequence"
+        
+        if not (recent_quiz_failed or weak_mastery):
             reason = f"Standard {level}-level sequence (user_state provided but no personalization needed)"
-            return self._get_sequence_by_level(level), reason
+            return base_sequence, reason
+        
+        sequence = [scene for scene in base_sequence if scene != "define_concept"]
+        
+        if "common_mistake" not in sequence:
+            quiz_index = sequence.index("mini_quiz") if "mini_quiz" in sequence else len(sequence)
+            sequence.insert(quiz_index, "common_mistake")
+        
+        reason_parts = []
+        if recent_quiz_failed:
+            reason_parts.append("recent quiz failure")
+        if weak_mastery:
+            reason_parts.append(f"weak mastery of {concept_id}")
+        
+        reason = f"Personalized sequence: skipped definition, added misconception handling due to {' and '.join(reason_parts)}"
+        
+        return tuple(sequence), reason
+    
+    def _get_personalized_sequence(self, cri: Dict, user_state: Dict, level: str) -> tuple:
+        concept_id = cri.get("concept_id", "unknown")
+        key = self._personalization_key(concept_id, user_state)
+        scene_program, reason = self._sequence_for_key(key, concept_id, level)
+        return list(scene_program), reason
     
     def update_feedback(self, concept_id: str, quiz_result: str):
         if concept_id in self.session_state:
@@ -126,3 +163,8 @@ class SceneSequencer:
 def plan_scenes(cri: Dict, quiz_result: str = None, user_state: Optional[Dict] = None) -> Dict:
     sequencer = SceneSequencer()
     return sequencer.plan_sequence(cri, quiz_result, user_state)
+
+
+def plan_scenes_many(cri: Dict, user_states: List[Optional[Dict]]) -> List[Dict]:
+    sequencer = SceneSequencer()
+    return sequencer.plan_sequence_many(cri, user_states)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from concept_resolver import ConceptResolver, ConceptNotFoundError
+
+
+def shard_name_for_domain(domain: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', domain.lower()).strip('_')
+
+
+def partition_ontology(ontology_path: str, output_dir: str, tenant: Optional[str] = None) -> Dict[str, str]:
+    with open(ontology_path, 'r', encoding='utf-8') as f:
+        concepts = json.load(f).get('concepts', [])
+
+    by_domain = {}
+    for concept in concepts:
+        by_domain.setdefault(concept.get('domain', 'general'), []).append(concept)
+
+    root = Path(output_dir)
+    if tenant:
+        root = root / tenant
+    root.mkdir(parents=True, exist_ok=True)
+
+    written = {}
+    for domain, domain_concepts in by_domain.items():
+        shard_path = root / f"{shard_name_for_domain(domain)}.json"
+        with open(shard_path, 'w', encoding='utf-8') as f:
+            json.dump({"concepts": domain_concepts}, f, indent=2, ensure_ascii=False)
+        written[domain] = str(shard_path)
+
+    return written
+
+
+def _match_shard(name: str, pattern: str) -> bool:
+    parts = name.split('/')
+    pattern_parts = pattern.split('/')
+    return len(parts) == len(pattern_parts) and all(
+        fnmatchcase(part, pattern_part) for part, pattern_part in zip(parts, pattern_parts)
+    )
+
+
+def _evict_periodically(resolver_ref, stop: threading.Event, interval: float):
+    while not stop.wait(interval):
+        resolver = resolver_ref()
+        if resolver is None:
+            return
+        resolver.evict_idle()
+        del resolver
+
+
+class ShardedConceptResolver:
+    DEFAULT_IDLE_TIMEOUT = 600.0
+
+    def __init__(
+        self,
+        shard_paths: Dict[str, str],
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        max_loaded_shards: Optional[int] = None,
+        compact: bool = False
+    ):
+        self.shard_paths = dict(shard_paths)
+        self.compact = compact
+        self.idle_timeout = idle_timeout
+        self.max_loaded_shards = max_loaded_shards
+        self._loaded = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._shard_locks = {name: threading.Lock() for name in self.shard_paths}
+        self.ontology_version = self._compute_version()
+
+        self._stop_eviction = threading.Event()
+        if idle_timeout is not None:
+            threading.Thread(
+                target=_evict_periodically,
+                args=(weakref.ref(self), self._stop_eviction, idle_timeout / 2),
+                name="shard-eviction",
+                daemon=True
+            ).start()
+
+    def _compute_version(self) -> str:
+        digest = hashlib.sha1()
+        for name in sorted(self.shard_paths):
+            stat = os.stat(self.shard_paths[name])
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def from_directory(cls, ontology_dir: str, **kwargs) -> "ShardedConceptResolver":
+        root = Path(ontology_dir)
+        shard_paths = {
+            path.relative_to(root).with_suffix('').as_posix(): str(path)
+            for path in sorted(root.rglob('*.json'))
+        }
+        return cls(shard_paths, **kwargs)
+
+    def route(
+        self,
+        shards: Optional[Iterable[str]] = None,
+        domains: Optional[Iterable[str]] = None,
+        tenant: Optional[str] = None
+    ) -> List[str]:
+        if shards is None and domains is None:
+            return list(self.shard_paths)
+
+        patterns = list(shards or [])
+        routed = set()
+
+        if domains is not None:
+            if tenant is None and any('/' in name for name in self.shard_paths):
+                raise ValueError("Domain routing over tenant shards requires a tenant")
+            prefix = f"{tenant}/" if tenant is not None else ""
+            routed.update(prefix + shard_name_for_domain(domain) for domain in domains)
+
+        return [
+            name for name in self.shard_paths
+            if name in routed or any(_match_shard(name, pattern) for pattern in patterns)
+        ]
+
+    def _get_shard(self, name: str) -> ConceptResolver:
+        with self._lock:
+            resolver = self._loaded.get(name)
+            if resolver is not None:
+                self._last_used[name] = time.monotonic()
+                return resolver
+
+        with self._shard_locks[name]:
+            with self._lock:
+                resolver = self._loaded.get(name)
+            loaded = resolver is None
+
+            if loaded:
+                resolver = ConceptResolver(self.shard_paths[name], compact=self.compact)
+
+            with self._lock:
+                self._loaded[name] = resolver
+                self._last_used[name] = time.monotonic()
+
+        if loaded:
+            self.evict_idle()
+        return resolver
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        evicted = []
+
+        with self._lock:
+            by_age = sorted(self._loaded, key=lambda n: self._last_used[n])
+
+            for name in by_age:
+                idle = self.idle_timeout is not None and now - self._last_used[name] > self.idle_timeout
+                over_limit = (
+                    self.max_loaded_shards is not None
+                    and len(self._loaded) > self.max_loaded_shards
+                )
+                if idle or over_limit:
+                    del self._loaded[name]
+                    del self._last_used[name]
+                    evicted.append(name)
+
+        return evicted
+
+    def close(self):
+        self._stop_eviction.set()
+
+    def loaded_shards(self) -> List[str]:
+        with self._lock:
+            return list(self._loaded)
+
+    def extract_candidates(
+        self,
+        query: str,
+        shards: Optional[Iterable[str]] = None,
+        domains: Optional[Iterable[str]] = None,
+        tenant: Optional[str] = None
+    ) -> List[tuple]:
+        names = self.route(shards, domains, tenant)
+        self.evict_idle()
+
+        candidates = []
+        for name in names:
+            resolver = self._get_shard(name)
+            for alias in resolver.extract_candidates(query):
+                candidates.append((alias, name, resolver))
+
+        candidates.sort(key=lambda c: len(c[0]), reverse=True)
+
+        return candidates
+
+    def resolve(
+        self,
+        query: str,
+        shards: Optional[Iterable[str]] = None,
+        domains: Optional[Iterable[str]] = None,
+        tenant: Optional[str] = None
+    ) -> Dict[str, any]:
+        candidates = self.extract_candidates(query, shards, domains, tenant)
+
+        if not candidates:
+            raise ConceptNotFoundError(
+                f"No matching concept found for query: '{query}'"
+            )
+
+        matched_alias, shard, resolver = candidates[0]
+        concept_id = resolver.alias_to_id[matched_alias]
+
+        return {
+            "concept_id": concept_id,
+            "concept": resolver.get_concept(concept_id),
+            "matched_alias": matched_alias,
+            "shard": shard
+        }
+
+    def get_all_concepts(self, shards: Optional[Iterable[str]] = None) -> List[Dict]:
+        concepts = []
+        for name in self.route(shards):
+            concepts.extend(self._get_shard(name).get_all_concepts())
+        return concepts
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+class SharedResultCache:
+    DEFAULT_MAX_ENTRIES = 100_000
+    EVICTION_INTERVAL = 64
+    EVICTION_BATCH = 64
+    ACCESS_REFRESH_SECONDS = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = None,
+        busy_timeout_ms: int = 5000
+    ):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._puts = 0
+
+        self._connection().executescript(
+            """
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS entries (
+                key BLOB PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+            CREATE TABLE IF NOT EXISTS stats (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                count INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO stats (id, count, bytes)
+                SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries;
+            CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+                UPDATE stats SET count = count + 1, bytes = bytes + new.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+                UPDATE stats SET bytes = bytes + new.size - old.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+                UPDATE stats SET count = count - 1, bytes = bytes - old.size WHERE id = 0;
+            END;
+            COMMIT;
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(version: str, query: str, outputs: Iterable[str],
+                 user_state: Optional[Dict] = None, shards: Optional[Iterable[str]] = None) -> bytes:
+        material = json.dumps(
+            [version, query, sorted(outputs), user_state, sorted(shards) if shards is not None else None],
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False
+        )
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, last_access FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            logger.warning("Shared cache lookup failed for %s", self.path, exc_info=True)
+            return None
+
+        if row is None:
+            return None
+
+        value, last_access = row
+        now = time.time()
+        if now - last_access > self.ACCESS_REFRESH_SECONDS:
+            try:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                pass
+
+        return bytes(value)
+
+    def put(self, key: bytes, value: bytes):
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, size = excluded.size, last_access = excluded.last_access",
+                (key, value, len(value), time.time())
+            )
+
+            self._puts += 1
+            if self._puts % self.EVICTION_INTERVAL == 0:
+                self.evict()
+        except sqlite3.Error:
+            logger.warning("Shared cache store failed for %s", self.path, exc_info=True)
+
+    def _stats(self, conn: sqlite3.Connection):
+        return conn.execute("SELECT count, bytes FROM stats WHERE id = 0").fetchone()
+
+    def evict(self) -> int:
+        conn = self._connection()
+        evicted = 0
+        count, total_bytes = self._stats(conn)
+
+        if self.max_entries is not None and count > self.max_entries:
+            evicted += conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access "
+                "LIMIT MAX(0, (SELECT count FROM stats WHERE id = 0) - ?))",
+                (self.max_entries,)
+            ).rowcount
+
+        if self.max_bytes is not None and total_bytes > self.max_bytes:
+            while total_bytes > self.max_bytes:
+                oldest = conn.execute(
+                    "SELECT key, size FROM entries ORDER BY last_access LIMIT ?",
+                    (self.EVICTION_BATCH,)
+                ).fetchall()
+                if not oldest:
+                    break
+
+                doomed = []
+                for key, size in oldest:
+                    doomed.append((key,))
+                    total_bytes -= size
+                    if total_bytes <= self.max_bytes:
+                        break
+
+                evicted += conn.executemany("DELETE FROM entries WHERE key = ?", doomed).rowcount
+                total_bytes = self._stats(conn)[1]
+
+        return evicted
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        return self._stats(self._connection())[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,345 @@
+import hashlib
+import json
+import re
+import sys
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+INTENT_CLASSES = ("teach_concept", "revise_concept", "test_understanding")
+LEVEL_CLASSES = ("beginner", "intermediate", "advanced")
+
+DEFAULT_N_FEATURES = 2 ** 18
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "The statistical engine requires numpy. Install it with 'pip install numpy'."
+        )
+
+
+class HashedNgramFeaturizer:
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, word_ngrams: int = 2, char_ngrams: int = 3):
+        self.n_features = n_features
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = char_ngrams
+
+    def _normalize_text(self, text: str) -> str:
+        return re.sub(r'\s+', ' ', text.lower().strip())
+
+    def _tokens(self, text: str) -> List[str]:
+        tokens = []
+        words = re.findall(r"[a-z0-9'=\-]+|\?", text)
+
+        for n in range(1, self.word_ngrams + 1):
+            for i in range(len(words) - n + 1):
+                tokens.append("w:" + " ".join(words[i:i + n]))
+
+        if self.char_ngrams:
+            padded = f" {text} "
+            for i in range(len(padded) - self.char_ngrams + 1):
+                tokens.append("c:" + padded[i:i + self.char_ngrams])
+
+        return tokens
+
+    def _hash(self, token: str) -> Tuple[int, float]:
+        h = zlib.crc32(token.encode('utf-8'))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        return h % self.n_features, sign
+
+    def transform(self, queries: Sequence[str]):
+        _require_numpy()
+
+        indptr = [0]
+        indices = []
+        data = []
+
+        for query in queries:
+            row = {}
+            for token in self._tokens(self._normalize_text(query)):
+                index, sign = self._hash(token)
+                row[index] = row.get(index, 0.0) + sign
+
+            norm = sum(v * v for v in row.values()) ** 0.5 or 1.0
+            for index, value in row.items():
+                indices.append(index)
+                data.append(value / norm)
+            indptr.append(len(indices))
+
+        return (
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(data, dtype=np.float32),
+        )
+
+
+def _sparse_dot(indptr, indices, data, weights):
+    n_rows = len(indptr) - 1
+    scores = np.zeros((n_rows, weights.shape[1]), dtype=np.float32)
+
+    if len(indices) == 0:
+        return scores
+
+    products = weights[indices] * data[:, None]
+    starts = indptr[:-1]
+    non_empty = indptr[1:] > starts
+    scores[non_empty] = np.add.reduceat(products, starts[non_empty], axis=0)
+    return scores
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class LinearClassifier:
+    def __init__(self, weights, bias, classes: Sequence[str]):
+        _require_numpy()
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.classes = tuple(classes)
+
+    def predict_proba(self, features):
+        indptr, indices, data = features
+        return _softmax(_sparse_dot(indptr, indices, data, self.weights) + self.bias)
+
+    def predict(self, features) -> List[Tuple[str, float]]:
+        proba = self.predict_proba(features)
+        best = proba.argmax(axis=1)
+        return [
+            (self.classes[label], float(proba[row, label]))
+            for row, label in enumerate(best)
+        ]
+
+    @classmethod
+    def fit(
+        cls,
+        features,
+        labels: Sequence[str],
+        classes: Sequence[str],
+        n_features: int,
+        epochs: int = 200,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4
+    ) -> "LinearClassifier":
+        _require_numpy()
+        indptr, indices, data = features
+
+        class_index = {label: i for i, label in enumerate(classes)}
+        targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        for row, label in enumerate(labels):
+            targets[row, class_index[label]] = 1.0
+
+        rows = np.repeat(np.arange(len(labels)), np.diff(indptr))
+        model = cls(
+            np.zeros((n_features, len(classes)), dtype=np.float32),
+            np.zeros(len(classes), dtype=np.float32),
+            classes
+        )
+        n_samples = max(len(labels), 1)
+
+        for _ in range(epochs):
+            error = (model.predict_proba(features) - targets) / n_samples
+
+            grad = np.zeros_like(model.weights)
+            np.add.at(grad, indices, error[rows] * data[:, None])
+            grad += l2 * model.weights
+
+            model.weights -= learning_rate * grad
+            model.bias -= learning_rate * error.sum(axis=0)
+
+        return model
+
+
+def _head_examples(examples: List[Dict], head: str, classes: Sequence[str]) -> List[Dict]:
+    head_examples = [e for e in examples if e.get(head)]
+
+    for e in head_examples:
+        if e[head] not in classes:
+            raise ValueError(
+                f"Unknown {head} label {e[head]!r} for query {e.get('query')!r}. Expected one of {list(classes)}"
+            )
+
+    seen = {e[head] for e in head_examples}
+    missing = [c for c in classes if c not in seen]
+    if missing:
+        raise ValueError(
+            f"Training data has no examples for {head} class(es) {missing} "
+            f"({len(head_examples)} labeled {head} examples in total)"
+        )
+
+    return head_examples
+
+
+class StatisticalModel:
+    def __init__(
+        self,
+        intent_classifier: LinearClassifier,
+        level_classifier: LinearClassifier,
+        featurizer: Optional[HashedNgramFeaturizer] = None,
+        version: Optional[str] = None
+    ):
+        self.intent_classifier = intent_classifier
+        self.level_classifier = level_classifier
+        self.featurizer = featurizer or HashedNgramFeaturizer(intent_classifier.weights.shape[0])
+        self.version = version or self._weights_digest()
+
+    def _weights_digest(self) -> str:
+        digest = hashlib.sha1()
+        for classifier in (self.intent_classifier, self.level_classifier):
+            digest.update(classifier.weights.tobytes())
+            digest.update(classifier.bias.tobytes())
+            digest.update("|".join(classifier.classes).encode('utf-8'))
+        featurizer = self.featurizer
+        digest.update(f"{featurizer.n_features}:{featurizer.word_ngrams}:{featurizer.char_ngrams}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Dict],
+        n_features: int = DEFAULT_N_FEATURES,
+        epochs: int = 200,
+        learning_rate: float = 0.5
+    ) -> "StatisticalModel":
+        examples = list(examples)
+        featurizer = HashedNgramFeaturizer(n_features)
+
+        intent_examples = _head_examples(examples, 'intent', INTENT_CLASSES)
+        level_examples = _head_examples(examples, 'level', LEVEL_CLASSES)
+
+        intent_classifier = LinearClassifier.fit(
+            featurizer.transform([e['query'] for e in intent_examples]),
+            [e['intent'] for e in intent_examples],
+            INTENT_CLASSES,
+            n_features,
+            epochs=epochs,
+            learning_rate=learning_rate
+        )
+        level_classifier = LinearClassifier.fit(
+            featurizer.transform([e['query'] for e in level_examples]),
+            [e['level'] for e in level_examples],
+            LEVEL_CLASSES,
+            n_features,
+            epochs=epochs,
+            learning_rate=learning_rate
+        )
+
+        return cls(intent_classifier, level_classifier, featurizer)
+
+    @classmethod
+    def train_from_jsonl(cls, path: str, **kwargs) -> "StatisticalModel":
+        examples = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    examples.append(json.loads(line))
+        return cls.train(examples, **kwargs)
+
+    def save(self, path: str) -> str:
+        path = str(path)
+        if not path.endswith('.npz'):
+            path += '.npz'
+
+        np.savez_compressed(
+            path,
+            n_features=np.asarray(self.featurizer.n_features),
+            word_ngrams=np.asarray(self.featurizer.word_ngrams),
+            char_ngrams=np.asarray(self.featurizer.char_ngrams),
+            intent_weights=self.intent_classifier.weights,
+            intent_bias=self.intent_classifier.bias,
+            intent_classes=np.asarray(self.intent_classifier.classes),
+            level_weights=self.level_classifier.weights,
+            level_bias=self.level_classifier.bias,
+            level_classes=np.asarray(self.level_classifier.classes)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "StatisticalModel":
+        _require_numpy()
+        with open(path, 'rb') as f:
+            version = hashlib.sha1(f.read()).hexdigest()[:16]
+
+        with np.load(path) as arrays:
+            featurizer = HashedNgramFeaturizer(
+                int(arrays['n_features']),
+                word_ngrams=int(arrays['word_ngrams']),
+                char_ngrams=int(arrays['char_ngrams'])
+            )
+            intent_classifier = LinearClassifier(
+                arrays['intent_weights'], arrays['intent_bias'],
+                [str(c) for c in arrays['intent_classes']]
+            )
+            level_classifier = LinearClassifier(
+                arrays['level_weights'], arrays['level_bias'],
+                [str(c) for c in arrays['level_classes']]
+            )
+        return cls(intent_classifier, level_classifier, featurizer, version=version)
+
+
+class StatisticalIntentDetector:
+    def __init__(self, model: StatisticalModel):
+        self.model = model
+        self.model_version = model.version
+
+    def detect(self, query: str) -> Dict[str, any]:
+        return self.detect_batch([query])[0]
+
+    def detect_batch(self, queries: Sequence[str]) -> List[Dict[str, any]]:
+        features = self.model.featurizer.transform(queries)
+        return [
+            {"intent": intent, "confidence": round(confidence, 2)}
+            for intent, confidence in self.model.intent_classifier.predict(features)
+        ]
+
+
+class StatisticalLevelEstimator:
+    def __init__(self, model: StatisticalModel):
+        self.model = model
+        self.model_version = model.version
+
+    def estimate(self, query: str, context: Dict = None) -> Dict[str, any]:
+        return self.estimate_batch([query])[0]
+
+    def estimate_batch(self, queries: Sequence[str]) -> List[Dict[str, any]]:
+        features = self.model.featurizer.transform(queries)
+        return [
+            {
+                "level": level,
+                "confidence": round(confidence, 2),
+                "reasoning": f"Statistical n-gram model predicts {level} level"
+            }
+            for level, confidence in self.model.level_classifier.predict(features)
+        ]
+
+
+def load_statistical_engine(model_path: str) -> Tuple[StatisticalIntentDetector, StatisticalLevelEstimator]:
+    model = StatisticalModel.load(model_path)
+    return StatisticalIntentDetector(model), StatisticalLevelEstimator(model)
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if len(argv) != 2:
+        print("Usage: python statistical_classifier.py <labeled.jsonl> <model.npz>")
+        return 1
+
+    train_path, model_path = argv
+    model = StatisticalModel.train_from_jsonl(train_path)
+    model_path = model.save(model_path)
+    print(f"Trained statistical engine from {train_path} → {model_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
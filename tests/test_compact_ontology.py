@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from concept_resolver import ConceptResolver, ConceptNotFoundError
+from main import IntentResolutionPipeline
+
+
+SPARSE_CONCEPTS = [
+    {"id": "X", "name": "Thing"},
+    {"name": "Other Thing", "id": "Y", "domain": "D", "extra": {"k": [1]}, "aliases": ["OTHER", "thing two"]},
+    {"id": "Z", "name": "Duplicate", "aliases": ["thing two"], "prerequisites": ["X"]}
+]
+
+
+@pytest.fixture(params=["bundled", "sparse"])
+def ontology_path(request, tmp_path):
+    if request.param == "bundled":
+        return None
+    path = tmp_path / "concepts.json"
+    path.write_text(json.dumps({"concepts": SPARSE_CONCEPTS}), encoding='utf-8')
+    return str(path)
+
+
+def _queries(resolver):
+    return [f"please explain {alias} now" for alias in resolver.alias_to_id] + ["nothing matches here"]
+
+
+def test_resolve_matches_default_mode(ontology_path):
+    default = ConceptResolver(ontology_path)
+    compact = ConceptResolver(ontology_path, compact=True)
+
+    for query in _queries(default):
+        try:
+            expected = default.resolve(query)
+        except ConceptNotFoundError:
+            with pytest.raises(ConceptNotFoundError):
+                compact.resolve(query)
+            continue
+
+        actual = compact.resolve(query)
+        assert actual == expected
+        assert json.dumps(actual) == json.dumps(expected)
+
+
+def test_lookup_index_matches_default_mode(ontology_path):
+    default = ConceptResolver(ontology_path)
+    compact = ConceptResolver(ontology_path, compact=True)
+
+    assert list(compact.alias_to_id) == list(default.alias_to_id)
+    assert {alias: compact.alias_to_id[alias] for alias in compact.alias_to_id} == default.alias_to_id
+    assert "not an alias" not in compact.alias_to_id
+
+
+def test_concept_views_match_source_dicts(ontology_path):
+    default = ConceptResolver(ontology_path).get_all_concepts()
+    compact = ConceptResolver(ontology_path, compact=True).get_all_concepts()
+
+    assert len(compact) == len(default)
+    for view, concept in zip(compact, default):
+        assert view == concept
+        assert list(view) == list(concept)
+        assert view.to_dict() == concept
+
+
+def test_pipeline_output_matches_default_mode():
+    default = IntentResolutionPipeline()
+    compact = IntentResolutionPipeline(concept_resolver=ConceptResolver(compact=True))
+
+    for query in ("Explain KCL", "Review Kirchhoff's voltage law", "Teach me about capacitors"):
+        assert json.dumps(compact.resolve(query, verbose=True)) == json.dumps(default.resolve(query, verbose=True))
+
+
+def test_memory_report_requires_tracking():
+    with pytest.raises(RuntimeError):
+        ConceptResolver(compact=True).memory_report()
+
+    report = ConceptResolver(compact=True, track_memory=True).memory_report()
+    assert set(report) == {"concepts", "id_to_index", "alias_to_id", "total"}
+    assert report["total"] == report["concepts"] + report["id_to_index"] + report["alias_to_id"]
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from main import IntentResolutionPipeline
+from response_serializer import ResponseSerializer
+
+
+QUERIES = [
+    "Explain KCL",
+    "What is Ohm's law?",
+    "Review Kirchhoff's voltage law",
+    "Test my understanding of series circuits",
+    "Teach me about capacitors"
+]
+
+USER_STATES = [
+    None,
+    {"concept_mastery": {"KCL-001": 0.2}},
+    {"concept_mastery": {"KCL-001": 0.9}, "preferred_modality": "visual"}
+]
+
+
+@pytest.fixture
+def pipeline():
+    return IntentResolutionPipeline()
+
+
+@pytest.mark.parametrize("verbose", [False, True])
+def test_pipeline_results_match_json_dumps(pipeline, verbose):
+    serializer = ResponseSerializer()
+
+    for _ in range(2):
+        for query in QUERIES:
+            for user_state in USER_STATES:
+                result = pipeline.resolve(query, verbose=verbose, user_state=user_state)
+                assert serializer.dumpb(result) == json.dumps(result).encode('ascii')
+
+
+def test_cohort_and_selected_fields_match_json_dumps(pipeline):
+    serializer = ResponseSerializer()
+
+    for result in pipeline.resolve_cohort("Explain KCL", USER_STATES * 3):
+        assert serializer.dumps(result) == json.dumps(result)
+
+    for fields in ({"cri"}, {"scene_plan", "metadata"}, {"prompts"}):
+        result = pipeline.resolve("Explain KCL", fields=fields)
+        assert serializer.dumps(result) == json.dumps(result)
+
+
+@pytest.mark.parametrize("value", [
+    {"cri": {"a": ["x", "y"]}, "scene_plan": {"a": ("x", "y")}},
+    {"cri": {"a": "é ✓"}, "prompts": [{"scene_type": "intro", "instruction": "\"quoted\"\n"}]},
+    {"cri": {"nested": [{"deep": [1, 2]}]}, "prompts": [["a"], "b"]},
+    {"cri": {1: "int key"}, "other": None},
+    {"cri": {"a": 1.5, "b": True, "c": None}, "scene_plan": []},
+    [1, 2, 3],
+    {}
+])
+def test_edge_cases_match_json_dumps(value):
+    serializer = ResponseSerializer()
+
+    for _ in range(2):
+        assert serializer.dumpb(value) == json.dumps(value).encode('ascii')
+
+
+def test_same_shape_with_different_contents_is_not_reused():
+    serializer = ResponseSerializer()
+    first = {"cri": {"concept_id": "A", "risk_misconceptions": ["x"]}}
+    second = {"cri": {"concept_id": "B", "risk_misconceptions": ["y"]}}
+
+    assert serializer.dumps(first) == json.dumps(first)
+    assert serializer.dumps(second) == json.dumps(second)
+    assert serializer.dumps(first) == json.dumps(first)
@@ -0,0 +1,108 @@
+import json
+import sqlite3
+from multiprocessing import get_context
+
+import pytest
+
+from main import IntentResolutionPipeline
+from shared_cache import SharedResultCache
+
+
+QUERIES = [
+    "Explain KCL",
+    "What is Ohm's law?",
+    "Review Kirchhoff's voltage law",
+    "Test my understanding of series circuits",
+    "Teach me about capacitors"
+]
+
+
+def _resolve_all(cache_path):
+    pipeline = IntentResolutionPipeline.with_shared_cache(cache_path)
+    return [json.dumps(pipeline.resolve(query)) for query in QUERIES]
+
+
+def _put_many(args):
+    cache_path, worker, count = args
+    cache = SharedResultCache(cache_path, max_entries=300)
+    for i in range(count):
+        cache.put(f"{worker}:{i}".encode('utf-8').ljust(16, b'\0'), b'x' * (i % 50 + 1))
+    return worker
+
+
+def _read(args):
+    cache_path, keys = args
+    cache = SharedResultCache(cache_path)
+    return [cache.get(key) for key in keys]
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def test_results_are_shared_across_processes(cache_path):
+    expected = [json.dumps(IntentResolutionPipeline().resolve(query)) for query in QUERIES]
+
+    with get_context("fork").Pool(4) as pool:
+        per_process = pool.map(_resolve_all, [cache_path] * 4)
+
+    assert all(results == expected for results in per_process)
+    assert len(SharedResultCache(cache_path)) == len(QUERIES)
+
+    with get_context("fork").Pool(2) as pool:
+        keys = [
+            SharedResultCache.make_key(IntentResolutionPipeline().cache_version, query.lower().strip(),
+                                       frozenset({"cri", "scene_plan", "prompts"}))
+            for query in QUERIES
+        ]
+        for values in pool.map(_read, [(cache_path, keys)] * 2):
+            assert [json.loads(value) for value in values] == [json.loads(result) for result in expected]
+
+
+def test_stats_stay_consistent_under_concurrent_writers(cache_path):
+    SharedResultCache(cache_path, max_entries=300)
+
+    with get_context("fork").Pool(4) as pool:
+        pool.map(_put_many, [(cache_path, worker, 500) for worker in range(4)])
+
+    cache = SharedResultCache(cache_path, max_entries=300)
+    conn = cache._connection()
+    assert cache._stats(conn) == conn.execute("SELECT COUNT(*), SUM(size) FROM entries").fetchone()
+
+    cache.evict()
+    assert len(cache) == 300
+
+
+def test_byte_limit_evicts_oldest_first(cache_path):
+    cache = SharedResultCache(cache_path, max_entries=None, max_bytes=1000)
+    for i in range(100):
+        cache.put(i.to_bytes(16, 'big'), b'x' * 100)
+
+    cache.evict()
+    conn = cache._connection()
+    count, total_bytes = cache._stats(conn)
+    assert total_bytes <= 1000
+    assert (count, total_bytes) == conn.execute("SELECT COUNT(*), SUM(size) FROM entries").fetchone()
+    assert cache.get((99).to_bytes(16, 'big')) is not None
+
+
+def test_unkeyable_user_state_bypasses_cache(cache_path):
+    pipeline = IntentResolutionPipeline.with_shared_cache(cache_path)
+    result = pipeline.resolve("Explain KCL", user_state={"concept_mastery": {"KCL-001": {"weak"}}})
+
+    assert result["cri"]["concept_id"] == "KCL-001"
+    assert len(pipeline.cache) == 0
+
+
+def test_locked_database_falls_back_to_computing(cache_path):
+    pipeline = IntentResolutionPipeline.with_shared_cache(cache_path, busy_timeout_ms=50)
+    expected = IntentResolutionPipeline().resolve("Explain KCL")
+
+    blocker = sqlite3.connect(cache_path, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    try:
+        assert pipeline.resolve("Explain KCL") == expected
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
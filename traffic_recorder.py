@@ -0,0 +1,108 @@
+import gzip
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+def _open_log(path: str, mode: str):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _to_json(entry: Dict) -> str:
+    return json.dumps(entry, separators=(',', ':'), ensure_ascii=False, default=repr)
+
+
+@contextmanager
+def timed_stage(timings: Optional[Dict[str, float]], stage: str):
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 3)
+
+
+class TrafficRecorder:
+    def __init__(self, path: str, record_outputs: bool = True):
+        self.path = path
+        self.record_outputs = record_outputs
+        self._lock = threading.Lock()
+        self._file = _open_log(path, 'a')
+
+    def record(
+        self,
+        query: str,
+        verbose: bool,
+        quiz_result: Optional[str],
+        user_state: Optional[Dict],
+        timings: Dict[str, float],
+        total_ms: float,
+        result: Optional[Dict] = None,
+        error: Optional[BaseException] = None,
+        shards: Optional[List[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+        ts: Optional[float] = None,
+        user_states: Optional[List[Optional[Dict]]] = None,
+        budget_ms: Optional[float] = None
+    ):
+        entry = {
+            "ts": round(time.time() if ts is None else ts, 6),
+            "query": query,
+            "verbose": verbose,
+            "quiz_result": quiz_result,
+            "user_state": user_state,
+            "stages_ms": timings,
+            "total_ms": round(total_ms, 3)
+        }
+
+        if shards is not None:
+            entry["shards"] = list(shards)
+
+        if fields is not None:
+            entry["fields"] = sorted(fields)
+
+        if budget_ms is not None:
+            entry["budget_ms"] = round(budget_ms, 3)
+
+        if user_states is not None:
+            entry["user_states"] = list(user_states)
+            entry["cohort_size"] = len(entry["user_states"])
+
+        if error is not None:
+            entry["error"] = type(error).__name__
+        elif self.record_outputs:
+            entry["output"] = result
+
+        line = _to_json(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_traffic_log(path: str) -> Iterator[Dict]:
+    with _open_log(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_traffic_log(path: str) -> List[Dict]:
+    return list(iter_traffic_log(path))
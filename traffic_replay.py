@@ -0,0 +1,244 @@
+import argparse
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from concept_resolver import normalize_text
+from main import IntentResolutionPipeline
+from traffic_recorder import read_traffic_log
+
+
+_worker_pipeline = None
+_thread_local = threading.local()
+
+
+def _init_process_worker(pipeline_factory: Callable):
+    global _worker_pipeline
+    _worker_pipeline = pipeline_factory()
+
+
+def _run_entry(pipeline, entry: Dict, scheduled: float) -> Dict:
+    start = time.monotonic()
+    try:
+        if "user_states" in entry:
+            output = pipeline.resolve_cohort(entry["query"], entry["user_states"], shards=entry.get("shards"))
+        else:
+            output = pipeline.resolve(
+                entry["query"],
+                entry.get("verbose", False),
+                entry.get("quiz_result"),
+                entry.get("user_state"),
+                shards=entry.get("shards"),
+                budget_ms=entry.get("budget_ms"),
+                fields=entry.get("fields")
+            )
+        error = None
+    except Exception as e:
+        output = None
+        error = type(e).__name__
+
+    finished = time.monotonic()
+    return {
+        "latency_ms": (finished - scheduled) * 1000,
+        "service_ms": (finished - start) * 1000,
+        "output": output,
+        "error": error
+    }
+
+
+def _run_in_process(entry: Dict, scheduled: float) -> Dict:
+    return _run_entry(_worker_pipeline, entry, scheduled)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _summarize(sorted_values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(_percentile(sorted_values, 50), 3),
+        "p90": round(_percentile(sorted_values, 90), 3),
+        "p99": round(_percentile(sorted_values, 99), 3),
+        "max": round(sorted_values[-1], 3) if sorted_values else 0.0
+    }
+
+
+def _diff_outputs(expected, actual, path: str = "") -> List[str]:
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        diffs = []
+        for key in sorted(set(expected) | set(actual)):
+            child = f"{path}.{key}" if path else key
+            if key not in actual:
+                diffs.append(f"{child}: missing in replay")
+            elif key not in expected:
+                diffs.append(f"{child}: not in recording")
+            else:
+                diffs.extend(_diff_outputs(expected[key], actual[key], child))
+        return diffs
+
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        diffs = []
+        for index, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            diffs.extend(_diff_outputs(expected_item, actual_item, f"{path}[{index}]"))
+        return diffs
+
+    if expected != actual:
+        return [f"{path}: {json.dumps(expected)} != {json.dumps(actual)}"]
+    return []
+
+
+class TrafficReplayer:
+    def __init__(
+        self,
+        entries: List[Dict],
+        pipeline_factory: Callable = IntentResolutionPipeline,
+        workers: int = 1,
+        use_processes: bool = False
+    ):
+        self.entries = sorted(entries, key=lambda e: e.get("ts", 0))
+        self.pipeline_factory = pipeline_factory
+        self.workers = workers
+        self.use_processes = use_processes
+
+    @classmethod
+    def from_log(cls, path: str, **kwargs) -> "TrafficReplayer":
+        return cls(read_traffic_log(path), **kwargs)
+
+    def _thread_pipeline(self):
+        pipeline = getattr(_thread_local, "pipeline", None)
+        if pipeline is None:
+            pipeline = self.pipeline_factory()
+            _thread_local.pipeline = pipeline
+        return pipeline
+
+    def _run_in_thread(self, entry: Dict, scheduled: float) -> Dict:
+        return _run_entry(self._thread_pipeline(), entry, scheduled)
+
+    def _make_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_process_worker,
+                initargs=(self.pipeline_factory,)
+            ), _run_in_process
+        return ThreadPoolExecutor(max_workers=1), self._run_in_thread
+
+    def _worker_index(self, entry: Dict) -> int:
+        output = entry.get("output") or {}
+        if isinstance(output, list):
+            output = output[0] if output else {}
+        cri = output.get("cri") or {}
+        session_key = cri.get("concept_id") or normalize_text(entry["query"])
+        return zlib.crc32(session_key.encode('utf-8')) % self.workers
+
+    def replay(self, speed: Optional[float] = 1.0) -> Dict:
+        executors = [self._make_executor() for _ in range(self.workers)]
+        futures = []
+
+        first_ts = self.entries[0].get("ts", 0) if self.entries else 0
+        start = time.monotonic()
+
+        try:
+            for entry in self.entries:
+                if speed:
+                    scheduled = start + (entry.get("ts", first_ts) - first_ts) / speed
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    scheduled = time.monotonic()
+                executor, run = executors[self._worker_index(entry)]
+                futures.append(executor.submit(run, entry, scheduled))
+
+            results = [future.result() for future in futures]
+        finally:
+            for executor, _ in executors:
+                executor.shutdown()
+
+        elapsed = time.monotonic() - start
+        return self._build_report(results, elapsed)
+
+    def _build_report(self, results: List[Dict], elapsed: float) -> Dict:
+        latencies = sorted(r["latency_ms"] for r in results)
+        service_times = sorted(r["service_ms"] for r in results)
+        mismatches = []
+
+        for index, (entry, result) in enumerate(zip(self.entries, results)):
+            if "error" in entry or result["error"]:
+                if entry.get("error") != result["error"]:
+                    mismatches.append({
+                        "index": index,
+                        "query": entry["query"],
+                        "diffs": [f"error: {entry.get('error')} != {result['error']}"]
+                    })
+                continue
+
+            if "output" not in entry:
+                continue
+
+            recorded_form = json.loads(json.dumps(result["output"], default=repr))
+            diffs = _diff_outputs(entry["output"], recorded_form)
+            if diffs:
+                mismatches.append({"index": index, "query": entry["query"], "diffs": diffs})
+
+        return {
+            "requests": len(results),
+            "errors": sum(1 for r in results if r["error"]),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(results) / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms": _summarize(latencies),
+            "service_ms": _summarize(service_times),
+            "mismatches": mismatches
+        }
+
+
+def replay_traffic(path: str, speed: Optional[float] = 1.0, workers: int = 1, use_processes: bool = False) -> Dict:
+    replayer = TrafficReplayer.from_log(path, workers=workers, use_processes=use_processes)
+    return replayer.replay(speed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded IntentResolutionPipeline traffic")
+    parser.add_argument("log", help="Traffic log written by TrafficRecorder (.jsonl or .jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed multiplier relative to recorded timing (default: 1.0)")
+    parser.add_argument("--fast", action="store_true", help="Ignore recorded timing and replay as fast as possible")
+    parser.add_argument("--workers", type=int, default=1, help="Number of concurrent workers")
+    parser.add_argument("--processes", action="store_true", help="Use worker processes instead of threads")
+    args = parser.parse_args()
+
+    report = replay_traffic(
+        args.log,
+        speed=None if args.fast else args.speed,
+        workers=args.workers,
+        use_processes=args.processes
+    )
+
+    print(f"Requests:   {report['requests']} ({report['errors']} errors)")
+    print(f"Elapsed:    {report['elapsed_s']}s")
+    print(f"Throughput: {report['throughput_rps']} req/s")
+    latency = report['latency_ms']
+    print(f"Latency:    p50={latency['p50']}ms p90={latency['p90']}ms "
+          f"p99={latency['p99']}ms max={latency['max']}ms (from scheduled send time)")
+    service = report['service_ms']
+    print(f"Service:    p50={service['p50']}ms p90={service['p90']}ms "
+          f"p99={service['p99']}ms max={service['max']}ms")
+
+    if report['mismatches']:
+        print(f"\n❌ {len(report['mismatches'])} output mismatches:")
+        for mismatch in report['mismatches'][:10]:
+            print(f"  #{mismatch['index']} \"{mismatch['query']}\"")
+            for diff in mismatch['diffs'][:5]:
+                print(f"    {diff}")
+    else:
+        print("\n✅ Outputs match recording")
+
+
+if __name__ == "__main__":
+    main()